@@ -1,12 +1,19 @@
 import argparse
+import asyncio
 import shlex
-import subprocess
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Self
 
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, Field
 
+_STREAM_READER_LIMIT = 1024 * 1024
+_READ_CHUNK_SIZE = 64 * 1024
+_MAX_CONCURRENT_COMMANDS = 32
+_command_slots = asyncio.Semaphore(_MAX_CONCURRENT_COMMANDS)
+_SHLEX_SPECIAL_CHARS = frozenset("\"'\\")
+
 
 @dataclass(frozen=True)
 class CliArgs:
@@ -91,17 +98,31 @@ def _parse_cli_args() -> CliArgs:
 
 
 def _parse_command(value: str) -> list[str]:
-    parts = shlex.split(value)
+    parts = _split_command(value)
 
     if not parts:
         raise argparse.ArgumentTypeError(f"command is empty: {value!r}")
 
-    return parts
+    return list(parts)
+
+
+@lru_cache(maxsize=32)
+def _split_command(value: str) -> tuple[str, ...]:
+    # Printable ASCII without quotes or backslashes splits identically with
+    # str.split, so skip the shlex lexer for plain commands like "git --help".
+    if (
+        value.isascii()
+        and value.isprintable()
+        and _SHLEX_SPECIAL_CHARS.isdisjoint(value)
+    ):
+        return tuple(value.split())
+
+    return tuple(shlex.split(value))
 
 
 def _create_mcp(config: ServerConfig) -> FastMCP:
     name = config.name
-    command = config.command
+    command = tuple(config.command)
     help_name = config.help_name
 
     instructions_lines = [
@@ -129,7 +150,7 @@ def _create_mcp(config: ServerConfig) -> FastMCP:
     )
 
     @mcp.tool(name=name, description=config.description)
-    def run_command(
+    async def run_command(
         arguments: list[str] = Field(
             default_factory=list,
             description="Additional command-line arguments appended to the base command",
@@ -139,42 +160,89 @@ def _create_mcp(config: ServerConfig) -> FastMCP:
             description="Optional standard input string piped to the command",
         ),
     ) -> CommandExecutionResult:
-        return _run([*command, *arguments], stdin)
+        full_command = list(command)
+        full_command.extend(arguments)
+        return await _run(full_command, stdin)
 
     @mcp.resource(
         f"command-mcp-help://{name}",
         name=help_name,
         description=f"Show help of `{name}` tool by running `{config.command_help_display}`.",
     )
-    def run_help_command() -> str:
-        result = _run(config.command_help, None)
+    async def run_help_command() -> str:
+        result = await _run(config.command_help, None)
         return result.stdout
 
     return mcp
 
 
-def _run(args: list[str], input: str | None) -> CommandExecutionResult:
-    try:
-        result = subprocess.run(
-            args,
-            input=input,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-    except (FileNotFoundError, OSError) as error:
-        args_joined = shlex.join(args)
-        raise RuntimeError(
-            f"Failed to execute command `{args_joined}`: {error}"
-        ) from error
-
-    return CommandExecutionResult(
+async def _run(args: list[str], input: str | None) -> CommandExecutionResult:
+    async with _command_slots:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.PIPE if input is not None else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=_STREAM_READER_LIMIT,
+            )
+        except (FileNotFoundError, OSError) as error:
+            args_joined = shlex.join(args)
+            raise RuntimeError(
+                f"Failed to execute command `{args_joined}`: {error}"
+            ) from error
+
+        try:
+            stdout, stderr, _ = await asyncio.gather(
+                _read_stream(proc.stdout),
+                _read_stream(proc.stderr),
+                _feed_stdin(proc.stdin, input),
+            )
+            await proc.wait()
+        except BaseException:
+            # Don't leave the command running when the call is cancelled.
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            raise
+
+    return CommandExecutionResult.model_construct(
         command=args,
-        exit_code=result.returncode,
-        stdout=result.stdout,
-        stderr=result.stderr,
+        exit_code=proc.returncode,
+        stdout=stdout.decode("utf-8", errors="replace"),
+        stderr=stderr.decode("utf-8", errors="replace"),
     )
 
 
+async def _read_stream(stream: asyncio.StreamReader | None) -> bytearray:
+    buffer = bytearray()
+
+    if stream is None:
+        return buffer
+
+    while chunk := await stream.read(_READ_CHUNK_SIZE):
+        buffer.extend(chunk)
+
+    return buffer
+
+
+async def _feed_stdin(
+    stream: asyncio.StreamWriter | None,
+    input: str | None,
+) -> None:
+    if stream is None:
+        return
+
+    try:
+        if input:
+            stream.write(input.encode())
+            await stream.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        # The command exited without consuming all of stdin.
+        pass
+
+    stream.close()
+
+
 if __name__ == "__main__":
     main()
@@ -1,13 +1,25 @@
+import asyncio
 import re
-from collections.abc import Iterator
-from urllib.parse import parse_qs, urlparse
+import string
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Annotated, Any
+from urllib.parse import parse_qsl, urlparse
 
 from mcp.server.fastmcp import FastMCP
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from requests import Session
+from requests.adapters import HTTPAdapter, Retry
 from youtube_transcript_api import (
     CouldNotRetrieveTranscript,
+    FetchedTranscript,
     NoTranscriptFound,
+    Transcript,
+    TranscriptList,
     TranscriptsDisabled,
+    TranslationLanguageNotAvailable,
     VideoUnavailable,
     YouTubeTranscriptApi,
 )
@@ -20,25 +32,82 @@ mcp = FastMCP(
         " Provide a video URL or video ID, and include a language code if necessary."
     ),
 )
-_transcript_api = YouTubeTranscriptApi()
+
+# YouTubeTranscriptApi and its requests.Session are not thread-safe, so every
+# worker thread gets its own instance (see _get_transcript_api).
+_thread_state = threading.local()
+_VIDEO_ID_LENGTH = 11
+_VIDEO_ID_CHARS_REMOVER = str.maketrans(
+    "",
+    "",
+    string.ascii_letters + string.digits + "_-",
+)
+_YOUTUBE_HOSTS = frozenset({
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtube-nocookie.com",
+    "www.youtube-nocookie.com",
+})
+_SHORT_LINK_HOSTS = frozenset({"youtu.be", "www.youtu.be"})
+_VIDEO_QUERY_KINDS = frozenset({"watch", "ytscreeningroom"})
+_VIDEO_PATH_KINDS = frozenset({"live", "shorts", "embed", "v"})
+# Matches the same hosts as the urlparse fallback in _parse_video_reference
+# and, like it, only looks at the first v= (or u=) query parameter.
+_VIDEO_URL_RE = re.compile(
+    r"(?i:https?://)?"
+    rf"(?:(?i:{'|'.join(map(re.escape, sorted(_SHORT_LINK_HOSTS)))})/"
+    rf"|(?i:{'|'.join(map(re.escape, sorted(_YOUTUBE_HOSTS)))})/"
+    r"(?:(?:watch|ytscreeningroom)\?(?:(?!v=)[^#&]*&)*v="
+    r"|embed/|v/|live/|shorts/"
+    r"|attribution_link\?(?:(?!u=)[^#&]*&)*u=/watch\?v=))"
+    r"([A-Za-z0-9_-]{11})(?=[/?&#]|$)"
+)
+_BATCH_CONCURRENCY = 10
+_batch_slots = asyncio.Semaphore(_BATCH_CONCURRENCY)
+_TRANSCRIPT_LIST_TTL = 300.0
+_TRANSCRIPT_LIST_CACHE_SIZE = 256
+_UNAVAILABLE_VIDEO_TTL = 300.0
+_UNAVAILABLE_VIDEO_CACHE_SIZE = 1024
+_unavailable_video_cache: dict[str, tuple[float, str]] = {}
+_unavailable_video_lock = threading.Lock()
 
 
 def main():
     mcp.run(transport="stdio")
 
 
-class TranscriptSegment(BaseModel):
-    start: float = Field(description="Segment start time in seconds")
-    duration: float = Field(description="Segment duration in seconds")
-    text: str = Field(description="Caption text")
+@dataclass(frozen=True, slots=True)
+class TranscriptSegment:
+    start: Annotated[float, Field(description="Segment start time in seconds")]
+    duration: Annotated[float, Field(description="Segment duration in seconds")]
+    text: Annotated[str, Field(description="Caption text")]
 
 
 class TranscriptResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     video_id: str = Field(description="Analyzed video ID")
     language: str = Field(description="Retrieved language code")
     segments: list[TranscriptSegment] = Field(description="List of caption segments")
 
 
+class TranscriptBatchEntry(BaseModel):
+    video: str = Field(description="Requested video URL or ID")
+    transcript: TranscriptResult | None = Field(
+        description="Retrieved captions, or null if retrieval failed"
+    )
+    error: str | None = Field(description="Reason the captions could not be retrieved")
+
+
+class TranscriptBatchResult(BaseModel):
+    language: str = Field(description="Requested language code")
+    entries: list[TranscriptBatchEntry] = Field(
+        description="Results in the same order as the requested videos"
+    )
+
+
 class TranscriptLanguage(BaseModel):
     language_code: str = Field(description="Language code (e.g., en, ja)")
     language: str = Field(description="Display name")
@@ -55,10 +124,6 @@ class AvailableLanguagesResult(BaseModel):
     )
 
 
-TranscriptResult.model_rebuild()
-AvailableLanguagesResult.model_rebuild()
-
-
 class TranscriptFetchError(Exception):
     """Custom exception"""
 
@@ -69,56 +134,88 @@ def _extract_video_id(video_reference: str) -> str:
     if not video_reference:
         raise TranscriptFetchError("The video identifier string is empty")
 
+    video_id = _parse_video_reference(video_reference)
+
+    if video_id is None:
+        raise TranscriptFetchError(
+            "Could not recognize the URL or ID for a YouTube video."
+            " Please provide it in the form https://youtu.be/<id> or https://www.youtube.com/watch?v=<id>."
+        )
+
+    return video_id
+
+
+@lru_cache(maxsize=1024)
+def _parse_video_reference(video_reference: str) -> str | None:
     if _looks_like_video_id(video_reference):
         return video_reference
 
+    # Every supported URL form has a path, so anything without a slash is
+    # neither an ID nor a URL we can handle.
+    if "/" not in video_reference:
+        return None
+
+    if match := _VIDEO_URL_RE.match(video_reference):
+        return match.group(1)
+
     parsed = urlparse(video_reference)
-    host = parsed.netloc.lower()
-
-    if "youtube.com" in host:
-        if parsed.path == "/watch":
-            query = parse_qs(parsed.query)
-            video_ids = query.get("v")
-            if video_ids:
-                candidate = video_ids[0]
-                if _looks_like_video_id(candidate):
-                    return candidate
-        if parsed.path.startswith("/live/") or parsed.path.startswith("/shorts/"):
-            parts = parsed.path.strip("/").split("/")
-            if len(parts) >= 2 and _looks_like_video_id(parts[1]):
-                return parts[1]
-    if "youtu.be" in host:
+    host = parsed.hostname or ""
+    candidate = None
+
+    if host in _YOUTUBE_HOSTS:
+        # "/shorts/<id>/..." splits into ["", "shorts", "<id>", "..."].
+        parts = parsed.path.split("/", 3)
+        kind = parts[1] if len(parts) > 1 else ""
+        if kind in _VIDEO_QUERY_KINDS and len(parts) == 2:
+            candidate = _first_query_value(parsed.query, "v")
+        elif kind == "attribution_link" and len(parts) == 2:
+            # The target is nested and usually percent-encoded, e.g.
+            # "u=%2Fwatch%3Fv%3D<id>%26feature%3Dshare".
+            target = urlparse(_first_query_value(parsed.query, "u") or "")
+            if target.path == "/watch":
+                candidate = _first_query_value(target.query, "v")
+        elif kind in _VIDEO_PATH_KINDS and len(parts) > 2:
+            candidate = parts[2]
+    elif host in _SHORT_LINK_HOSTS:
         candidate = parsed.path.lstrip("/")
-        if _looks_like_video_id(candidate):
-            return candidate
 
-    raise TranscriptFetchError(
-        "Could not recognize the URL or ID for a YouTube video."
-        " Please provide it in the form https://youtu.be/<id> or https://www.youtube.com/watch?v=<id>."
-    )
+    if candidate is not None and _looks_like_video_id(candidate):
+        return candidate
+
+    return None
+
+
+def _first_query_value(query: str, key: str) -> str | None:
+    for name, value in parse_qsl(query):
+        if name == key:
+            return value
+
+    return None
 
 
 def _looks_like_video_id(candidate: str) -> bool:
-    return bool(re.fullmatch(r"[A-Za-z0-9_-]{11}", candidate))
+    return len(candidate) == _VIDEO_ID_LENGTH and not candidate.translate(
+        _VIDEO_ID_CHARS_REMOVER
+    )
 
 
-def _fetch_transcript(video_id: str, language: str) -> list[dict]:
+def _fetch_transcript(video_id: str, language: str) -> FetchedTranscript:
     try:
-        fetched = _transcript_api.fetch(video_id, languages=[language])
-        return fetched.to_raw_data()
-    except NoTranscriptFound:
-        transcripts = _transcript_api.list(video_id)
+        transcripts = _list_transcripts(video_id)
         try:
             transcript = transcripts.find_transcript([language])
-            return transcript.fetch().to_raw_data()
+            return transcript.fetch()
         except NoTranscriptFound as original_error:
-            for t in transcripts:
-                if t.is_translatable:
-                    try:
-                        translated = t.translate(language)
-                        return translated.fetch().to_raw_data()
-                    except NoTranscriptFound:
-                        continue
+            # Every translatable transcript offers the same target languages,
+            # so a single translation attempt is enough.
+            source = next((t for t in transcripts if t.is_translatable), None)
+            if source is not None:
+                try:
+                    translated = source.translate(language)
+                except TranslationLanguageNotAvailable:
+                    pass
+                else:
+                    return translated.fetch()
             raise TranscriptFetchError(
                 f"Captions with language code {language} were not found"
             ) from original_error
@@ -126,59 +223,165 @@ def _fetch_transcript(video_id: str, language: str) -> list[dict]:
         raise TranscriptFetchError(str(error)) from error
 
 
-def _yield_languages(video_id: str) -> Iterator[TranscriptLanguage]:
+def _list_transcripts(video_id: str) -> TranscriptList:
+    now = time.monotonic()
+
+    with _unavailable_video_lock:
+        failure = _unavailable_video_cache.get(video_id)
+    if failure is not None and now - failure[0] < _UNAVAILABLE_VIDEO_TTL:
+        raise TranscriptFetchError(failure[1])
+
+    # The cached lists hold Transcript objects bound to this thread's session,
+    # so each worker thread keeps its own cache.
+    cache = _get_transcript_list_cache()
+    cached = cache.pop(video_id, None)
+    if cached is not None and now - cached[0] < _TRANSCRIPT_LIST_TTL:
+        # Re-insert to mark the entry as most recently used.
+        cache[video_id] = cached
+        return cached[1]
+
+    try:
+        transcripts = _get_transcript_api().list(video_id)
+    except (VideoUnavailable, TranscriptsDisabled) as error:
+        with _unavailable_video_lock:
+            _put_bounded(
+                _unavailable_video_cache,
+                video_id,
+                (now, str(error)),
+                _UNAVAILABLE_VIDEO_CACHE_SIZE,
+            )
+        raise
+
+    _put_bounded(cache, video_id, (now, transcripts), _TRANSCRIPT_LIST_CACHE_SIZE)
+
+    return transcripts
+
+
+def _get_transcript_api() -> YouTubeTranscriptApi:
+    api = getattr(_thread_state, "transcript_api", None)
+
+    if api is None:
+        session = Session()
+        session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=10,
+                pool_maxsize=20,
+                max_retries=Retry(total=2, backoff_factor=0.3),
+            ),
+        )
+        api = _thread_state.transcript_api = YouTubeTranscriptApi(http_client=session)
+
+    return api
+
+
+def _get_transcript_list_cache() -> dict[str, tuple[float, TranscriptList]]:
+    cache = getattr(_thread_state, "transcript_list_cache", None)
+
+    if cache is None:
+        cache = _thread_state.transcript_list_cache = {}
+
+    return cache
+
+
+def _put_bounded(cache: dict[str, Any], key: str, value: Any, max_size: int) -> None:
+    cache.pop(key, None)
+    if len(cache) >= max_size:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+def _list_languages(video_id: str) -> list[TranscriptLanguage]:
     try:
-        transcripts = _transcript_api.list(video_id)
+        transcripts = _list_transcripts(video_id)
     except (VideoUnavailable, TranscriptsDisabled, CouldNotRetrieveTranscript) as error:
         raise TranscriptFetchError(str(error)) from error
 
-    seen_codes: set[str] = set()
+    by_code: dict[str, Transcript] = {}
+    for t in transcripts:
+        by_code.setdefault(t.language_code, t)
 
-    for t in sorted(transcripts, key=lambda x: x.language_code):
-        code = t.language_code
-        if code in seen_codes:
-            continue
-        seen_codes.add(code)
-        yield TranscriptLanguage(
+    return [
+        TranscriptLanguage.model_construct(
             language_code=code,
             language=t.language,
             is_generated=t.is_generated,
             is_translatable=t.is_translatable,
         )
+        for code, t in sorted(by_code.items())
+    ]
 
 
 @mcp.tool()
-def list_transcript_languages(video: str) -> AvailableLanguagesResult:
+async def list_transcript_languages(video: str) -> AvailableLanguagesResult:
     """Retrieve the list of available caption languages for the specified YouTube video"""
     video_id = _extract_video_id(video)
-    languages = [*_yield_languages(video_id)]
+    languages = await asyncio.to_thread(_list_languages, video_id)
 
-    return AvailableLanguagesResult(video_id=video_id, languages=languages)
+    return AvailableLanguagesResult.model_construct(
+        video_id=video_id,
+        languages=languages,
+    )
 
 
 @mcp.tool()
-def get_transcript(video: str, language: str) -> TranscriptResult:
+async def get_transcript(video: str, language: str) -> TranscriptResult:
     """Retrieve captions for the specified YouTube video"""
-    if not language.strip():
+    if not (language := language.strip()):
         raise ValueError(
             "Provide a language code for the language parameter (e.g., en, ja)"
         )
 
+    return await _build_transcript_result(video, language)
+
+
+@mcp.tool()
+async def get_transcripts(videos: list[str], language: str) -> TranscriptBatchResult:
+    """Retrieve captions for multiple YouTube videos concurrently"""
+    if not (language := language.strip()):
+        raise ValueError(
+            "Provide a language code for the language parameter (e.g., en, ja)"
+        )
+
+    async def fetch(video: str) -> TranscriptResult:
+        async with _batch_slots:
+            return await _build_transcript_result(video, language)
+
+    results = await asyncio.gather(
+        *(fetch(video) for video in videos), return_exceptions=True
+    )
+
+    entries = [
+        TranscriptBatchEntry.model_construct(
+            video=video,
+            transcript=None if isinstance(result, BaseException) else result,
+            error=str(result) if isinstance(result, BaseException) else None,
+        )
+        for video, result in zip(videos, results)
+    ]
+
+    return TranscriptBatchResult.model_construct(
+        language=language,
+        entries=entries,
+    )
+
+
+async def _build_transcript_result(video: str, language: str) -> TranscriptResult:
     video_id = _extract_video_id(video)
-    raw_segments = _fetch_transcript(video_id, language.strip())
+    fetched = await asyncio.to_thread(_fetch_transcript, video_id, language)
 
     segments = [
         TranscriptSegment(
-            start=s["start"],
-            duration=s["duration"],
-            text=s["text"],
+            start=snippet.start,
+            duration=snippet.duration,
+            text=snippet.text,
         )
-        for s in raw_segments
+        for snippet in fetched
     ]
 
-    return TranscriptResult(
+    return TranscriptResult.model_construct(
         video_id=video_id,
-        language=language.strip(),
+        language=language,
         segments=segments,
     )
 